@@ -6,18 +6,25 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
-
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Load environment variables from .env file (skipped when there is none, e.g. in production)
+_DOTENV_PATH = BASE_DIR / '.env'
+if _DOTENV_PATH.exists():
+    load_dotenv(_DOTENV_PATH)
+
+_get = os.environ.get
+
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = os.getenv('SECRET_KEY', 'django-insecure-hackathon-dev-key-change-in-production')
+SECRET_KEY = _get('SECRET_KEY', 'django-insecure-hackathon-dev-key-change-in-production')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = os.getenv('DEBUG', 'True').lower() in ('true', '1', 'yes')
+DEBUG = _get('DEBUG', 'True').lower() in ('true', '1', 'yes')
 
-ALLOWED_HOSTS = [host.strip() for host in os.getenv('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')]
+# Comma-separated; whitespace and duplicate entries are dropped, order is kept
+ALLOWED_HOSTS = tuple(dict.fromkeys(
+    host.strip() for host in _get('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',') if host.strip()
+))
 
 # Application definition
 INSTALLED_APPS = [
@@ -88,32 +95,32 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework Configuration
 REST_FRAMEWORK = {
-    'DEFAULT_RENDERER_CLASSES': [
+    'DEFAULT_RENDERER_CLASSES': (
         'rest_framework.renderers.JSONRenderer',
-    ],
-    'DEFAULT_PARSER_CLASSES': [
+    ),
+    'DEFAULT_PARSER_CLASSES': (
         'rest_framework.parsers.JSONParser',
-    ],
+    ),
 }
 
 # CORS Configuration
-CORS_ALLOWED_ORIGINS = [
-    origin.strip() 
-    for origin in os.getenv(
+CORS_ALLOWED_ORIGINS = tuple(dict.fromkeys(
+    origin.strip()
+    for origin in _get(
         'CORS_ALLOWED_ORIGINS',
         'http://localhost:5173,http://localhost:3000'
     ).split(',')
     if origin.strip()
-]
+))
 
 # Also allow credentials
 CORS_ALLOW_CREDENTIALS = True
 
 # Allow all common HTTP methods
-CORS_ALLOW_METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'HEAD']
+CORS_ALLOW_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'HEAD')
 
 # Allow all common headers
-CORS_ALLOW_HEADERS = [
+CORS_ALLOW_HEADERS = (
     'accept',
     'accept-encoding',
     'authorization',
@@ -123,10 +130,30 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
-]
+)
 
 # Expose headers that might be needed
-CORS_EXPOSE_HEADERS = ['content-type', 'content-length']
+CORS_EXPOSE_HEADERS = ('content-type', 'content-length')
 
 # Gemini API Configuration
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+GEMINI_API_KEY = _get('GEMINI_API_KEY', '')
+
+# Optional model name (e.g. gemini-2.5-flash) used as-is, skipping model discovery
+GEMINI_MODEL = _get('GEMINI_MODEL', '')
+
+# Retries on Gemini rate-limit errors (0 disables retrying) and the first backoff delay in seconds
+GEMINI_MAX_RETRIES = int(_get('GEMINI_MAX_RETRIES', '2'))
+GEMINI_RETRY_BASE_DELAY = int(_get('GEMINI_RETRY_BASE_DELAY', '30'))
+
+# Seconds to reuse a complete analysis of the same README by the same model (0 disables caching);
+# results go to Django's default cache, an in-process LocMemCache unless CACHES is set
+ANALYSIS_CACHE_TIMEOUT = int(_get('ANALYSIS_CACHE_TIMEOUT', str(24 * 60 * 60)))
+
+# GitHub API Configuration (optional token raises the README fetch rate limit)
+GITHUB_TOKEN = _get('GITHUB_TOKEN', '')
+
+# Run analyses on a background thread pool: POST /api/analyze/ returns 202 with a
+# job id to poll at /api/analyze/<job_id>/ instead of blocking until Gemini answers.
+# Jobs are tracked in-process, so this requires a single gunicorn worker process.
+ANALYSIS_ASYNC = _get('ANALYSIS_ASYNC', 'False').lower() in ('true', '1', 'yes')
+ANALYSIS_MAX_WORKERS = int(_get('ANALYSIS_MAX_WORKERS', '4'))
@@ -0,0 +1,153 @@
+"""
+Background analysis jobs for RepoRecon Backend
+Runs perform_deep_analysis off the request thread and tracks job status in-process
+"""
+
+import functools
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from django.conf import settings
+
+from core.gemini_service import perform_deep_analysis, GeminiAnalysisError
+
+logger = logging.getLogger(__name__)
+
+# Jobs keyed by id, oldest first. Finished jobs are kept for an hour after they
+# finish so clients can poll for the result, and the oldest finished ones are dropped
+# beyond the size limit; pending and running jobs are never dropped, so once the
+# table is full of them new submissions are refused (which also bounds the pool queue)
+_JOB_TTL = 60 * 60  # seconds
+_MAX_JOBS = 256
+_JOBS_LOCK = threading.Lock()
+_JOBS = OrderedDict()
+
+# Job states reported by the status endpoint
+PENDING = 'pending'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+class AnalysisQueueFullError(Exception):
+    """Raised when too many analysis jobs are pending or running to accept another"""
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def _executor() -> ThreadPoolExecutor:
+    """
+    Return the shared worker pool, creating it on first use.
+    
+    Returns:
+        ThreadPoolExecutor sized by ANALYSIS_MAX_WORKERS
+    """
+    return ThreadPoolExecutor(
+        max_workers=settings.ANALYSIS_MAX_WORKERS,
+        thread_name_prefix='analysis',
+    )
+
+
+def _prune_jobs(now: float, max_jobs: int) -> None:
+    """
+    Drop expired finished jobs, then the oldest finished ones beyond max_jobs.
+    
+    Pending and running jobs are kept. The caller holds _JOBS_LOCK.
+    
+    Args:
+        now: Current time.monotonic() value
+        max_jobs: Number of jobs to keep at most, if enough of them are finished
+    """
+    excess = len(_JOBS) - max_jobs
+    finished = [job_id for job_id, job in _JOBS.items() if 'finished_at' in job]
+    for job_id in finished:
+        if excess > 0 or now - _JOBS[job_id]['finished_at'] > _JOB_TTL:
+            del _JOBS[job_id]
+            excess -= 1
+
+
+def _update_job(job_id: str, **fields: Any) -> None:
+    """Update a job's fields if it is still tracked."""
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+        if job is not None:
+            job.update(fields)
+
+
+def _run_job(job_id: str, github_url: str) -> None:
+    """
+    Run one analysis and record its result or error on the job.
+    
+    Args:
+        job_id: Id returned by submit_analysis()
+        github_url: GitHub repository URL
+    """
+    _update_job(job_id, status=RUNNING)
+    try:
+        result = perform_deep_analysis(github_url)
+        _update_job(job_id, status=COMPLETED, data=result, finished_at=time.monotonic())
+        logger.info(f'Analysis job {job_id} completed for: {github_url}')
+    except GeminiAnalysisError as e:
+        logger.error(f'Analysis job {job_id} failed: {str(e)}')
+        _update_job(job_id, status=FAILED, error=str(e), finished_at=time.monotonic())
+    except Exception as e:
+        logger.error(f'Unexpected error in analysis job {job_id}: {str(e)}')
+        _update_job(
+            job_id,
+            status=FAILED,
+            error='An unexpected error occurred during analysis',
+            finished_at=time.monotonic(),
+        )
+
+
+def submit_analysis(github_url: str) -> str:
+    """
+    Queue a repository analysis on the background worker pool.
+    
+    Args:
+        github_url: GitHub repository URL
+        
+    Returns:
+        Job id to poll with get_analysis_job()
+        
+    Raises:
+        AnalysisQueueFullError: If _MAX_JOBS jobs are already pending or running
+    """
+    job_id = uuid.uuid4().hex
+    now = time.monotonic()
+    with _JOBS_LOCK:
+        # Make room for the new job by dropping finished ones only
+        _prune_jobs(now, _MAX_JOBS - 1)
+        if len(_JOBS) >= _MAX_JOBS:
+            raise AnalysisQueueFullError(
+                'Too many analyses in progress. Please try again in a few minutes.'
+            )
+        _JOBS[job_id] = {'status': PENDING, 'created_at': now}
+    
+    _executor().submit(_run_job, job_id, github_url)
+    logger.info(f'Queued analysis job {job_id} for: {github_url}')
+    return job_id
+
+
+def get_analysis_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up the status of an analysis job.
+    
+    Args:
+        job_id: Id returned by submit_analysis()
+        
+    Returns:
+        Dictionary with status and, once finished, data or error;
+        None if the job is unknown or has expired
+    """
+    with _JOBS_LOCK:
+        _prune_jobs(time.monotonic(), _MAX_JOBS)
+        job = _JOBS.get(job_id)
+        if job is None:
+            return None
+        return {key: value for key, value in job.items() if key not in ('created_at', 'finished_at')}
@@ -3,88 +3,234 @@ Gemini Service for Deep Repository Analysis
 Handles GitHub scraping, AI analysis, and response validation
 """
 
+import functools
+import hashlib
 import json
 import re
 import logging
+import os
+import threading
 import time
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlsplit
 
-import google.generativeai as genai
-import requests
 from django.conf import settings
+from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
 
+# Resolved Gemini model, cached per process as (api_key, model) so that
+# model discovery (a list_models() round-trip) only happens once per key.
+_MODEL_LOCK = threading.Lock()
+_CACHED_MODEL: Optional[Tuple[str, Any]] = None
 
-def clean_readme_content(readme_text: str) -> str:
+# Available model names are cached on disk and refreshed in the background once stale
+_MODEL_LIST_TTL = 24 * 60 * 60  # seconds
+_MODEL_REFRESH_LOCK = threading.Lock()
+_MODEL_REFRESHING = False
+
+# Only the start of a README is ever sent to Gemini, so larger bodies are cut here
+_MAX_README_BYTES = 64 * 1024
+
+# Recently fetched READMEs keyed by (owner, repo), as (fetched_at, etag, text); entries
+# older than the TTL are revalidated with If-None-Match instead of refetched
+_README_CACHE_TTL = 10 * 60  # seconds
+_README_CACHE_SIZE = 256
+_README_CACHE_LOCK = threading.Lock()
+_README_CACHE = OrderedDict()
+
+# Character budget for the README sent to Gemini, and how much raw README is
+# cleaned to fill it; cleaning rarely shrinks text more than tenfold, so the
+# regexes never need to scan past this prefix of a large README
+_MAX_README_LENGTH = 1200
+_README_SCAN_LENGTH = 16 * _MAX_README_LENGTH
+
+# Generation settings for the analysis request; JSON mode is added when the SDK supports it
+_GENERATION_CONFIG = {
+    'temperature': 0.2,  # Very low for consistent JSON
+    'max_output_tokens': 1500,  # Enough for complete JSON response
+    'top_p': 0.7,
+    'top_k': 15,
+}
+_JSON_GENERATION_CONFIG = {
+    **_GENERATION_CONFIG,
+    'response_mime_type': 'application/json',  # Force JSON output
+}
+
+_JSON_DECODER = json.JSONDecoder()
+
+# orjson parses responses faster when installed; both decoders raise ValueError subclasses
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Ultra-minimal analysis prompt; only the README is filled in per request
+_PROMPT_TEMPLATE = """Analyze this README and return ONLY valid JSON (no markdown, no code blocks, no text):
+
+README: %(readme)s
+
+Required JSON format (copy this structure exactly):
+{
+    "summary": "Brief 2 sentence architecture summary",
+    "mermaid_code": "sequenceDiagram\\n    participant User\\n    participant App\\n    User->>App: request",
+    "detected_issues": ["Issue 1", "Issue 2"],
+    "fix_recommendations": ["Fix 1", "Fix 2"]
+}
+
+CRITICAL: Return ONLY the JSON object. No markdown, no code blocks, no explanations, no text before or after."""
+
+# Patterns used to clean README content, compiled once at import time
+_HTML_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_IMG_MD_RE = re.compile(r'!\[.*?\]\(.*?\)')
+_IMG_TAG_RE = re.compile(r'<img[^>]*/?>', re.IGNORECASE)
+_BADGE_MD_RE = re.compile(r'\[!\[.*?\]\(.*?\)\]\(.*?\)')
+_BADGE_URL_RE = re.compile(
+    r'https?://[^\s]*(?:badge|shield|img\.shields\.io|travis-ci|codecov|coveralls)[^\s\)]*',
+    re.IGNORECASE,
+)
+# License, contributing, sponsor and changelog sections share one shape
+# (header up to the next header), so a single alternation removes them all in one pass
+_SECTION_KEYWORDS = (
+    'License|Licence|Legal|Copyright',
+    'Contributing|Code of Conduct|Contributors|Acknowledgements?',
+    'Sponsor|Donate|Support|Funding',
+    'Changelog|Release Notes|Version History',
+)
+_FLUFF_SECTION_RE = re.compile(
+    r'#+\s*(?:' + '|'.join(_SECTION_KEYWORDS) + r').*?(?=\n#|\Z)', re.DOTALL | re.IGNORECASE
+)
+# One of these lowercase words must appear for _FLUFF_SECTION_RE to match
+_SECTION_GATE_WORDS = (
+    'licen', 'legal', 'copyright',
+    'contributing', 'code of conduct', 'contributors', 'acknowledgement',
+    'sponsor', 'donate', 'support', 'funding',
+    'changelog', 'release notes', 'version history',
+)
+_LICENSE_BOLD_RE = re.compile(r'\*\*(?:License|Licence)\*\*.*?(?=\n\n|\n#|\Z)', re.DOTALL | re.IGNORECASE)
+_HTML_TAG_RE = re.compile(r'</?(?:div|span|p|br|hr|table|tr|td|th|thead|tbody)[^>]*>', re.IGNORECASE)
+_STYLE_TAG_RE = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+_STYLE_ATTR_RE = re.compile(r'style="[^"]*"', re.IGNORECASE)
+_ALIGN_ATTR_RE = re.compile(r'align="[^"]*"', re.IGNORECASE)
+_LINK_RE = re.compile(r'\[([^\]]+)\]\([^\)]+\)')
+_EMPTY_LINK_RE = re.compile(r'\[\]\([^\)]*\)')
+_HR_RE = re.compile(r'\n[-*_]{3,}\n')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+# Trailing runs only match from their first character, so a long run of spaces
+# mid-line is not rescanned from every position (which would be quadratic)
+_LINE_TRIM_RE = re.compile(r'^[^\S\n]+|(?<![^\S\n])[^\S\n]+$', re.MULTILINE)
+
+# README trimming: header lines (group 1 is the header text) and section keywords
+_HEADER_LINE_RE = re.compile(r'^[^\S\n]*#+([^\n]*)', re.MULTILINE)
+_PRIORITY_HEADERS = ('install', 'usage', 'feature', 'getting started', 'quick start', 'overview', 'about')
+_SKIP_HEADERS = ('faq', 'troubleshoot', 'test', 'development', 'roadmap')
+
+# Patterns used to parse Gemini responses, compiled once at import time
+_PREFIX_RE = re.compile(
+    r'^(?:Sure,?\s*'
+    r'|Here\s+is\s+your\s+'
+    r'|Here\'s\s+your\s+'
+    r'|Here\s+is\s+the\s+'
+    r'|Here\'s\s+the\s+'
+    r'|Of\s+course,?\s*'
+    r'|I\'ll\s+'
+    r'|Let\s+me\s+)+',
+    re.IGNORECASE,
+)
+_TRAIL_RE = re.compile(r'\.\s*(Is there anything else|Let me know|Hope this helps).*$', re.IGNORECASE)
+_FENCE_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+_FIELD_RE = re.compile(
+    r'"(?P<key>summary|mermaid_code|detected_issues|fix_recommendations)"\s*:\s*'
+    r'(?:"(?P<string>(?:[^"\\]|\\.)*)"|\[(?P<array>.*?)(?:\]|$))',
+    re.DOTALL,
+)
+_QUOTED_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+
+def clean_readme_content(readme_text: str, max_input_length: Optional[int] = None) -> str:
     """
     Strip fluff from README to keep only valuable text for LLM analysis.
     Removes images, badges, license sections, and other non-essential content.
     
     Args:
         readme_text: Raw README content
+        max_input_length: Optional number of characters to clean; longer
+            READMEs are cut there first, at a line break when one is near
         
     Returns:
         Cleaned README with only valuable text
     """
     text = readme_text
     
-    # Remove HTML comments
-    text = re.sub(r'<!--.*?-->', '', text, flags=re.DOTALL)
+    # Only clean the useful prefix of very large READMEs
+    if max_input_length is not None and len(text) > max_input_length:
+        cut = text.rfind('\n', max_input_length // 2, max_input_length)
+        text = text[:cut if cut != -1 else max_input_length]
     
-    # Remove images: ![alt](url) and <img> tags
-    text = re.sub(r'!\[.*?\]\(.*?\)', '', text)
-    text = re.sub(r'<img[^>]*/?>', '', text, flags=re.IGNORECASE)
+    # Each stage is gated by a cheap substring check so patterns that cannot
+    # match are never run over the whole README
     
-    # Remove badges (common badge URLs)
-    text = re.sub(r'\[!\[.*?\]\(.*?\)\]\(.*?\)', '', text)  # [![badge](img)](link)
-    text = re.sub(r'https?://[^\s]*(?:badge|shield|img\.shields\.io|travis-ci|codecov|coveralls)[^\s\)]*', '', text, flags=re.IGNORECASE)
+    # Remove HTML comments
+    if '<!--' in text:
+        text = _HTML_COMMENT_RE.sub('', text)
     
-    # Remove license sections
-    text = re.sub(r'#+\s*(?:License|Licence|Legal|Copyright).*?(?=\n#|\Z)', '', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'\*\*(?:License|Licence)\*\*.*?(?=\n\n|\n#|\Z)', '', text, flags=re.DOTALL | re.IGNORECASE)
+    # Lowercased copy for gating the case-insensitive patterns below
+    lowered = text.lower()
     
-    # Remove contributing/code of conduct sections
-    text = re.sub(r'#+\s*(?:Contributing|Code of Conduct|Contributors|Acknowledgements?).*?(?=\n#|\Z)', '', text, flags=re.DOTALL | re.IGNORECASE)
+    # Remove images: ![alt](url) and <img> tags
+    if '![' in text:
+        text = _IMG_MD_RE.sub('', text)
+    if '<img' in lowered:
+        text = _IMG_TAG_RE.sub('', text)
     
-    # Remove sponsor/donation sections
-    text = re.sub(r'#+\s*(?:Sponsor|Donate|Support|Funding).*?(?=\n#|\Z)', '', text, flags=re.DOTALL | re.IGNORECASE)
+    # Remove badges (common badge URLs)
+    if '[![' in text:
+        text = _BADGE_MD_RE.sub('', text)  # [![badge](img)](link)
+    if any(host in lowered for host in ('badge', 'shield', 'travis-ci', 'codecov', 'coveralls')):
+        text = _BADGE_URL_RE.sub('', text)
     
-    # Remove changelog sections
-    text = re.sub(r'#+\s*(?:Changelog|Release Notes|Version History).*?(?=\n#|\Z)', '', text, flags=re.DOTALL | re.IGNORECASE)
+    # Remove license, contributing/code of conduct, sponsor/donation and changelog sections
+    if any(word in lowered for word in _SECTION_GATE_WORDS):
+        text = _FLUFF_SECTION_RE.sub('', text)
+    if '**licen' in lowered:
+        text = _LICENSE_BOLD_RE.sub('', text)
     
     # Remove HTML tags but keep content
-    text = re.sub(r'<(?:div|span|p|br|hr|table|tr|td|th|thead|tbody)[^>]*>', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'</(?:div|span|p|br|hr|table|tr|td|th|thead|tbody)>', '', text, flags=re.IGNORECASE)
+    if '<' in text:
+        text = _HTML_TAG_RE.sub('', text)
     
     # Remove inline HTML attributes and style tags
-    text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'style="[^"]*"', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'align="[^"]*"', '', text, flags=re.IGNORECASE)
+    if '<style' in lowered:
+        text = _STYLE_TAG_RE.sub('', text)
+    if 'style=' in lowered:
+        text = _STYLE_ATTR_RE.sub('', text)
+    if 'align=' in lowered:
+        text = _ALIGN_ATTR_RE.sub('', text)
     
     # Remove excessive links but keep link text: [text](url) -> text
     # Keep first few links, remove rest to save tokens
-    link_count = 0
-    def replace_link(match):
-        nonlocal link_count
-        link_count += 1
-        if link_count <= 5:  # Keep first 5 links intact
-            return match.group(0)
-        return match.group(1)  # Return just the text
-    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', replace_link, text)
-    
-    # Remove empty markdown links
-    text = re.sub(r'\[\]\([^\)]*\)', '', text)
+    if '](' in text:
+        for link_count, match in enumerate(_LINK_RE.finditer(text), 1):
+            if link_count == 5:  # Keep first 5 links intact
+                keep_until = match.end()
+                text = text[:keep_until] + _LINK_RE.sub(r'\1', text[keep_until:])  # Just the text
+                break
+        
+        # Remove empty markdown links
+        text = _EMPTY_LINK_RE.sub('', text)
     
-    # Remove horizontal rules
-    text = re.sub(r'\n[-*_]{3,}\n', '\n', text)
+    # Remove horizontal rules (ungated: rules may mix -, * and _, e.g. -*-)
+    text = _HR_RE.sub('\n', text)
     
     # Collapse multiple blank lines to single
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    if '\n\n\n' in text:
+        text = _BLANK_LINES_RE.sub('\n\n', text)
     
     # Remove leading/trailing whitespace from lines
-    lines = [line.strip() for line in text.split('\n')]
-    text = '\n'.join(lines)
+    text = _LINE_TRIM_RE.sub('', text)
     
     # Remove empty lines at start/end
     text = text.strip()
@@ -97,54 +243,151 @@ class GeminiAnalysisError(Exception):
     pass
 
 
+@functools.lru_cache(maxsize=None)
+def _http_session() -> Any:
+    """
+    Return the shared HTTP session, creating it on first use.
+    
+    requests is imported here rather than at module level to keep it out of
+    Django startup. The session pools keep-alive connections to GitHub.
+    
+    Returns:
+        Shared requests.Session instance
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
+
+def _get_cached_readme(key: Tuple[str, str]) -> Optional[Tuple[float, str, str]]:
+    """
+    Look up a cached README, fresh or expired.
+    
+    Args:
+        key: (owner, repo) tuple, lowercased
+        
+    Returns:
+        (fetched_at, etag, text) tuple, or None on a miss
+    """
+    with _README_CACHE_LOCK:
+        entry = _README_CACHE.get(key)
+        if entry is not None:
+            _README_CACHE.move_to_end(key)
+        return entry
+
+
+def _cache_readme(key: Tuple[str, str], etag: str, readme_text: str) -> None:
+    """
+    Store a README, evicting the least recently used entry when full.
+    
+    Args:
+        key: (owner, repo) tuple, lowercased
+        etag: ETag returned by GitHub, or empty string
+        readme_text: README content
+    """
+    with _README_CACHE_LOCK:
+        _README_CACHE[key] = (time.monotonic(), etag, readme_text)
+        _README_CACHE.move_to_end(key)
+        while len(_README_CACHE) > _README_CACHE_SIZE:
+            _README_CACHE.popitem(last=False)
+
+
 def fetch_github_readme(repo_url: str) -> str:
     """
-    Fetch README.md from a GitHub repository.
+    Fetch the README from a GitHub repository's default branch.
+    
+    Uses the GitHub REST API readme endpoint, which resolves the default
+    branch and README filename server-side in a single request. Results are
+    kept in a small in-process LRU cache for a few minutes per repository,
+    then revalidated with their ETag.
     
     Args:
         repo_url: GitHub repository URL (e.g., https://github.com/owner/repo)
         
     Returns:
-        Content of README.md file
+        Content of the README, decoded as UTF-8 and capped at _MAX_README_BYTES
         
     Raises:
         GeminiAnalysisError: If README cannot be fetched
     """
+    import requests
+    
     try:
         # Normalize the URL
-        repo_url = repo_url.strip().rstrip('/')
+        repo_url = repo_url.strip()
+        if '://' not in repo_url:
+            repo_url = 'https://' + repo_url
+        url_parts = urlsplit(repo_url)
         
         # Extract owner and repo from URL
-        if 'github.com' not in repo_url:
+        host = url_parts.hostname or ''
+        if host != 'github.com' and not host.endswith('.github.com'):
             raise GeminiAnalysisError('Invalid GitHub URL provided')
         
-        parts = repo_url.replace('https://', '').replace('http://', '').split('/')
-        if len(parts) < 3:
+        parts = url_parts.path.strip('/').split('/', 2)
+        if len(parts) < 2 or not parts[0] or not parts[1]:
             raise GeminiAnalysisError('Invalid GitHub URL format')
         
-        owner, repo = parts[1], parts[2]
+        owner, repo = parts[0], parts[1]
+        if repo.endswith('.git'):
+            repo = repo[:-4]
         
-        # Construct raw GitHub URL
-        raw_url = f'https://raw.githubusercontent.com/{owner}/{repo}/main/README.md'
+        cache_key = (owner.lower(), repo.lower())
+        cached = _get_cached_readme(cache_key)
+        if cached is not None and time.monotonic() - cached[0] <= _README_CACHE_TTL:
+            logger.debug(f'Using cached README for {owner}/{repo}')
+            return cached[2]
         
-        response = requests.get(raw_url, timeout=10)
+        # Ask for the raw README body so no base64 decoding is needed
+        api_url = f'https://api.github.com/repos/{owner}/{repo}/readme'
+        headers = {'Accept': 'application/vnd.github.raw'}
+        if settings.GITHUB_TOKEN:
+            headers['Authorization'] = f'Bearer {settings.GITHUB_TOKEN}'
+        # Revalidate an expired entry; a 304 does not count against the rate limit
+        if cached is not None and cached[1]:
+            headers['If-None-Match'] = cached[1]
         
-        # Try master branch if main fails
-        if response.status_code == 404:
-            raw_url = f'https://raw.githubusercontent.com/{owner}/{repo}/master/README.md'
-            response = requests.get(raw_url, timeout=10)
-        
-        if response.status_code != 200:
-            raise GeminiAnalysisError(
-                f'Could not fetch README from {repo_url}. '
-                f'Ensure the repository is public and has a README.'
-            )
+        # Stream the body so at most _MAX_README_BYTES are downloaded from large READMEs
+        with _http_session().get(api_url, headers=headers, timeout=10, stream=True) as response:
+            if response.status_code == 304 and cached is not None:
+                logger.debug(f'Cached README for {owner}/{repo} is still current')
+                _cache_readme(cache_key, cached[1], cached[2])
+                return cached[2]
+            
+            # GitHub reports rate limits as 429, or as 403 with no requests remaining
+            # (primary limit) or a Retry-After header (secondary limit)
+            if response.status_code == 429 or (
+                response.status_code == 403
+                and (response.headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in response.headers)
+            ):
+                raise GeminiAnalysisError(
+                    'GitHub API rate limit exceeded. Set GITHUB_TOKEN in .env or try again later.'
+                )
+            
+            if response.status_code != 200:
+                raise GeminiAnalysisError(
+                    f'Could not fetch README from {repo_url}. '
+                    f'Ensure the repository is public and has a README.'
+                )
+            
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=8192):
+                body += chunk
+                if len(body) >= _MAX_README_BYTES:
+                    break
+            etag = response.headers.get('ETag', '')
         
-        return response.text
+        # GitHub serves READMEs as UTF-8; decoding directly skips charset detection
+        readme_text = body[:_MAX_README_BYTES].decode('utf-8', errors='replace')
+        _cache_readme(cache_key, etag, readme_text)
+        return readme_text
         
     except requests.RequestException as e:
         raise GeminiAnalysisError(f'Network error fetching GitHub repository: {str(e)}')
-    except IndexError:
+    except ValueError:
         raise GeminiAnalysisError('Invalid GitHub URL format')
 
 
@@ -153,6 +396,8 @@ def configure_gemini_model() -> Any:
     Configure and return Gemini 1.5 Flash model instance (Flash-only for free tier).
     
     Flash model is required because it has 10x higher rate limits than Pro models.
+    The resolved model (and genai.configure) is cached per process and reused until
+    GEMINI_API_KEY changes or the API rejects the key or the model.
     
     Returns:
         Configured Gemini Flash model
@@ -160,85 +405,174 @@ def configure_gemini_model() -> Any:
     Raises:
         GeminiAnalysisError: If API key is not configured or Flash model is not available
     """
+    global _CACHED_MODEL
+    
     api_key = settings.GEMINI_API_KEY
     if not api_key:
         raise GeminiAnalysisError(
             'Gemini API key not configured. Set GEMINI_API_KEY in .env'
         )
     
+    cached = _CACHED_MODEL
+    if cached is not None and cached[0] == api_key:
+        return cached[1]
+    
+    with _MODEL_LOCK:
+        # Another thread may have resolved the model while we waited
+        cached = _CACHED_MODEL
+        if cached is not None and cached[0] == api_key:
+            return cached[1]
+        
+        model = _resolve_gemini_model(api_key)
+        _CACHED_MODEL = (api_key, model)
+        return model
+
+
+def _invalidate_cached_model() -> None:
+    """Drop the cached model so the next call to configure_gemini_model() resolves it again."""
+    global _CACHED_MODEL
+    
+    with _MODEL_LOCK:
+        _CACHED_MODEL = None
+    logger.warning('Discarded cached Gemini model after the API rejected it')
+
+
+def _is_auth_error(error: Exception) -> bool:
+    """
+    Check whether a Gemini API error is an authentication/permission failure.
+    
+    Args:
+        error: Exception raised by the Gemini SDK
+        
+    Returns:
+        True for rejected or unauthorized API keys
+    """
+    from google.api_core import exceptions as google_exceptions
+    
+    if isinstance(error, (google_exceptions.Unauthenticated, google_exceptions.PermissionDenied)):
+        return True
+    # An invalid key is reported as 400 INVALID_ARGUMENT
+    return isinstance(error, google_exceptions.InvalidArgument) and 'api key' in str(error).lower()
+
+
+def _is_model_error(error: Exception) -> bool:
+    """
+    Check whether a Gemini API error means the model itself is unusable.
+    
+    GenerativeModel() accepts any name without an API call, so a model chosen
+    without a successful listing (or a mistyped GEMINI_MODEL) only fails here.
+    
+    Args:
+        error: Exception raised by the Gemini SDK
+        
+    Returns:
+        True for unknown or unsupported models
+    """
+    from google.api_core import exceptions as google_exceptions
+    
+    if isinstance(error, google_exceptions.NotFound):
+        return True
+    return isinstance(error, google_exceptions.InvalidArgument) and 'model' in str(error).lower()
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """
+    Check whether a Gemini API error is a rate-limit/quota failure.
+    
+    Args:
+        error: Exception raised by the Gemini SDK
+        
+    Returns:
+        True for 429 / RESOURCE_EXHAUSTED errors
+    """
+    from google.api_core import exceptions as google_exceptions
+    
+    if isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)):
+        return True
+    if isinstance(error, google_exceptions.GoogleAPICallError):
+        return False
+    # Errors not raised through google.api_core are classified by their message
+    error_str = str(error).lower()
+    return any(x in error_str for x in ('429', 'quota', 'rate limit', 'resource exhausted'))
+
+
+def _resolve_gemini_model(api_key: str) -> Any:
+    """
+    Discover and instantiate the best available Gemini model for an API key.
+    
+    Args:
+        api_key: Gemini API key
+        
+    Returns:
+        Configured Gemini model
+        
+    Raises:
+        GeminiAnalysisError: If no working model is available
+    """
+    import google.generativeai as genai
+    
     genai.configure(api_key=api_key)
     
-    # List all available models first
-    available_model_names = []
-    flash_models = []
+    # A configured model name needs no discovery, only a single get_model() lookup;
+    # GenerativeModel() accepts any name, so the lookup is what catches a typo
+    if settings.GEMINI_MODEL:
+        try:
+            genai.get_model(settings.GEMINI_MODEL)
+            model = genai.GenerativeModel(settings.GEMINI_MODEL)
+            logger.info(f'Using configured Gemini model: {settings.GEMINI_MODEL}')
+            return model
+        except Exception as e:
+            logger.warning(f'Configured model {settings.GEMINI_MODEL} is not available: {str(e)}. Discovering models.')
+    
+    # List all available models first (served from the on-disk cache when possible)
     try:
-        for model in genai.list_models():
-            # Extract model name (remove 'models/' prefix)
-            model_name = model.name.replace('models/', '')
-            # Check if it supports generateContent
-            supports_generate = False
-            if hasattr(model, 'supported_generation_methods'):
-                if 'generateContent' in model.supported_generation_methods:
-                    supports_generate = True
-                    available_model_names.append(model_name)
-                    # Track Flash models specifically
-                    if 'flash' in model_name.lower():
-                        flash_models.append(model_name)
-            else:
-                # If we can't check, add it anyway and try
-                available_model_names.append(model_name)
-                if 'flash' in model_name.lower():
-                    flash_models.append(model_name)
-        
+        available_model_names = _list_model_names(api_key)
         logger.info(f'Found {len(available_model_names)} available Gemini models')
-        if flash_models:
-            logger.info(f'Flash models found: {flash_models}')
-        if available_model_names:
-            logger.info(f'All available models: {available_model_names}')
     except Exception as e:
         logger.warning(f'Could not list models: {str(e)}. Will try common model names.')
         available_model_names = []
-        flash_models = []
     
-    # Try Flash models in order of preference (newer versions first, then older)
-    # Flash models have 10x higher rate limits than Pro models
+    # Single pass: use the first listed Flash model that loads, remembering the
+    # first non-Flash model as a fallback. Flash models have 10x higher rate limits.
+    first_generative = None
+    for model_name in available_model_names:
+        if 'flash' not in model_name.lower():
+            if first_generative is None:
+                first_generative = model_name
+            continue
+        try:
+            model = genai.GenerativeModel(model_name)
+            logger.info(f'Successfully configured Flash model: {model_name}')
+            return model
+        except Exception as e:
+            logger.debug(f'Failed to load Flash model {model_name}: {str(e)}')
+    
+    # If no Flash found in list, try preferred Flash models directly. GenerativeModel()
+    # accepts any name, so when the list is known only models present in it are tried.
+    available = set(available_model_names)
     preferred_flash_models = [
         'gemini-2.5-flash-latest',    # Latest stable flash model
         'gemini-2.5-flash-lite-preview-09-2025',    # Experimental
     ]
-    
-    # First, try any Flash models found in available list
-    if flash_models:
-        for flash_model in flash_models:
-            try:
-                model = genai.GenerativeModel(flash_model)
-                logger.info(f'Successfully configured Flash model: {flash_model}')
-                return model
-            except Exception as e:
-                logger.debug(f'Failed to load Flash model {flash_model}: {str(e)}')
-                continue
-    
-    # If no Flash found in list, try preferred Flash models directly
     for model_name in preferred_flash_models:
+        if available and model_name not in available:
+            continue
         try:
             model = genai.GenerativeModel(model_name)
             logger.info(f'Successfully configured Flash model: {model_name}')
             return model
         except Exception as e:
             logger.debug(f'Failed to load Flash model {model_name}: {str(e)}')
-            continue
     
     # If Flash models fail, try any available model (better than nothing)
-    if available_model_names:
+    if first_generative is not None:
         logger.warning('No Flash models available, trying any available model...')
-        for model_name in available_model_names:
-            try:
-                model = genai.GenerativeModel(model_name)
-                logger.info(f'Using available model (not Flash): {model_name}')
-                return model
-            except Exception as e:
-                logger.debug(f'Failed to load model {model_name}: {str(e)}')
-                continue
+        try:
+            model = genai.GenerativeModel(first_generative)
+            logger.info(f'Using available model (not Flash): {first_generative}')
+            return model
+        except Exception as e:
+            logger.debug(f'Failed to load model {first_generative}: {str(e)}')
     
     # Final error message with helpful info
     error_msg = 'Could not find any working Gemini model. '
@@ -251,82 +585,222 @@ def configure_gemini_model() -> Any:
     raise GeminiAnalysisError(error_msg)
 
 
-def parse_gemini_response(response_text: str) -> Dict[str, Any]:
+def _model_cache_file(api_key: str) -> Path:
+    """
+    Return the path of the on-disk Gemini model list cache for an API key.
+    
+    Models available to one key may differ from another's, so the file name
+    includes a hash of the key (never the key itself).
+    
+    Args:
+        api_key: Gemini API key
+        
+    Returns:
+        Path of the cache file
+    """
+    key_digest = hashlib.blake2b(api_key.encode('utf-8'), digest_size=8).hexdigest()
+    return Path(settings.BASE_DIR) / '.cache' / f'gemini_models-{key_digest}.json'
+
+
+def _fetch_model_names() -> List[str]:
+    """
+    List Gemini models that support generateContent via the API.
+    
+    Returns:
+        Model names without the 'models/' prefix
+    """
+    import google.generativeai as genai
+    
+    # Models that don't report their generation methods are kept and tried anyway
+    return [
+        model.name.removeprefix('models/')
+        for model in genai.list_models()
+        if 'generateContent' in getattr(model, 'supported_generation_methods', ('generateContent',))
+    ]
+
+
+def _write_model_cache(api_key: str, model_names: List[str]) -> None:
+    """
+    Atomically write the model list cache file.
+    
+    Args:
+        api_key: Gemini API key the models were listed with
+        model_names: Model names to persist
+    """
+    cache_file = _model_cache_file(api_key)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix('.tmp')
+    tmp_file.write_text(json.dumps(model_names))
+    os.replace(tmp_file, cache_file)
+
+
+def _refresh_model_cache(api_key: str) -> None:
+    """Refresh the model list cache for an API key in the background, logging any failure."""
+    global _MODEL_REFRESHING
+    
+    try:
+        _write_model_cache(api_key, _fetch_model_names())
+        logger.debug('Refreshed Gemini model list cache')
+    except Exception as e:
+        logger.warning(f'Could not refresh Gemini model list cache: {str(e)}')
+    finally:
+        _MODEL_REFRESHING = False
+
+
+def _list_model_names(api_key: str) -> List[str]:
+    """
+    Return available model names using a stale-while-revalidate disk cache.
+    
+    A fresh cache file skips the list_models() RPC entirely. A stale one is
+    still used while a background thread refreshes it; only a missing or
+    unreadable cache fetches synchronously.
+    
+    Args:
+        api_key: Gemini API key (genai must already be configured with it)
+        
+    Returns:
+        Model names without the 'models/' prefix
+    """
+    global _MODEL_REFRESHING
+    
+    cache_file = _model_cache_file(api_key)
+    try:
+        age = time.time() - cache_file.stat().st_mtime
+        model_names = json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        model_names = _fetch_model_names()
+        try:
+            _write_model_cache(api_key, model_names)
+        except OSError as e:
+            logger.warning(f'Could not write Gemini model list cache: {str(e)}')
+        return model_names
+    
+    if age > _MODEL_LIST_TTL:
+        with _MODEL_REFRESH_LOCK:
+            start_refresh = not _MODEL_REFRESHING
+            _MODEL_REFRESHING = True
+        if start_refresh:
+            logger.debug('Gemini model list cache is stale, refreshing in background')
+            threading.Thread(target=_refresh_model_cache, args=(api_key,), daemon=True).start()
+    
+    return model_names
+
+
+@functools.lru_cache(maxsize=None)
+def _supports_json_mode() -> bool:
+    """
+    Check once whether the installed SDK accepts response_mime_type.
+    
+    Returns:
+        True if GenerationConfig has a response_mime_type field
+    """
+    import google.generativeai as genai
+    
+    fields = getattr(genai.types.GenerationConfig, '__dataclass_fields__', {})
+    return 'response_mime_type' in fields
+
+
+def parse_gemini_response(response_text: str, json_mode: bool = False) -> Dict[str, Any]:
     """
     Parse Gemini response with error handling for hallucinations and truncation.
     Extracts JSON from the response even if wrapped in markdown or text.
     
     Args:
         response_text: Raw response from Gemini
+        json_mode: Whether the response was requested in JSON mode, in which
+            case it is parsed directly before falling back to the cleanup steps
         
     Returns:
         Parsed JSON response
         
+    Raises:
+        GeminiAnalysisError: If response cannot be parsed
+    """
+    return _parse_gemini_response(response_text, json_mode)[0]
+
+
+def _parse_gemini_response(response_text: str, json_mode: bool) -> Tuple[Dict[str, Any], bool]:
+    """
+    Parse Gemini response as parse_gemini_response() does, reporting how it was parsed.
+    
+    Args:
+        response_text: Raw response from Gemini
+        json_mode: Whether the response was requested in JSON mode
+        
+    Returns:
+        Parsed JSON response, and True if it was decoded as complete JSON or
+        False if fields were recovered from truncated output
+        
     Raises:
         GeminiAnalysisError: If response cannot be parsed
     """
     # Log the raw response for debugging
     logger.debug(f'Raw Gemini response (first 500 chars): {response_text[:500]}')
     
+    # JSON mode responses are plain JSON, so try them as-is before any cleanup
+    if json_mode:
+        try:
+            parsed = _json_loads(response_text)
+            logger.debug('Successfully parsed JSON mode response')
+            return parsed, True
+        except ValueError:
+            logger.debug('JSON mode response is not plain JSON, falling back to cleanup')
+    
     try:
-        # Strip whitespace and remove any conversational prefixes
         text = response_text.strip()
         
-        # Remove common conversational prefixes and suffixes
-        prefixes_to_remove = [
-            r'^Sure,?\s*',
-            r'^Here\s+is\s+your\s+',
-            r'^Here\'s\s+your\s+',
-            r'^Here\s+is\s+the\s+',
-            r'^Here\'s\s+the\s+',
-            r'^Of\s+course,?\s*',
-            r'^I\'ll\s+',
-            r'^Let\s+me\s+',
-        ]
-        for prefix in prefixes_to_remove:
-            text = re.sub(prefix, '', text, flags=re.IGNORECASE)
-        
-        # Remove trailing conversational text
-        text = re.sub(r'\.\s*(Is there anything else|Let me know|Hope this helps).*$', '', text, flags=re.IGNORECASE)
-        text = text.strip()
-        
-        # Try direct JSON parsing first (after stripping)
-        try:
-            parsed = json.loads(text)
-            logger.debug('Successfully parsed JSON directly')
-            return parsed
-        except json.JSONDecodeError as e:
-            logger.debug(f'Direct JSON parse failed: {str(e)}')
-        
-        # Try extracting JSON from markdown code blocks (remove ```json or ```)
-        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', text, re.DOTALL)
-        if json_match:
+        # Prose cleanup is only needed when the response doesn't open with the JSON object
+        if not text.startswith('{'):
+            # Remove common conversational prefixes and suffixes
+            text = _PREFIX_RE.sub('', text, count=1)
+            
+            # Remove trailing conversational text
+            text = _TRAIL_RE.sub('', text)
+            text = text.strip()
+            
+            # Try direct JSON parsing first (after stripping)
             try:
-                parsed = json.loads(json_match.group(1).strip())
-                logger.debug('Successfully parsed JSON from markdown code block')
-                return parsed
-            except json.JSONDecodeError as e:
-                logger.debug(f'Markdown JSON parse failed: {str(e)}')
+                parsed = _json_loads(text)
+                logger.debug('Successfully parsed JSON directly')
+                return parsed, True
+            except ValueError as e:
+                logger.debug(f'Direct JSON parse failed: {str(e)}')
+            
+            # Try extracting JSON from markdown code blocks (remove ```json or ```)
+            json_match = _FENCE_RE.search(text)
+            if json_match:
+                try:
+                    parsed = _json_loads(json_match.group(1).strip())
+                    logger.debug('Successfully parsed JSON from markdown code block')
+                    return parsed, True
+                except ValueError as e:
+                    logger.debug(f'Markdown JSON parse failed: {str(e)}')
         
         # Try finding JSON object in response - handle incomplete/truncated JSON
         first_brace = text.find('{')
         if first_brace != -1:
-            json_str = text[first_brace:]
+            # More opening than closing braces and no closing brace at the end means the
+            # output was cut off, so skip straight to field extraction
+            truncated = (
+                not text.endswith('}')
+                and text.count('{', first_brace) > text.count('}', first_brace)
+            )
             
-            # Try direct parse first
-            try:
-                parsed = json.loads(json_str)
-                logger.debug('Successfully parsed JSON from first brace')
-                return parsed
-            except json.JSONDecodeError:
-                pass
+            # Decode one JSON value starting at the brace, ignoring any trailing text
+            if not truncated:
+                try:
+                    parsed, _ = _JSON_DECODER.raw_decode(text, first_brace)
+                    logger.debug('Successfully parsed JSON from first brace')
+                    return parsed, True
+                except json.JSONDecodeError:
+                    pass
             
             # JSON is likely truncated - extract fields manually
             logger.info('JSON appears truncated, extracting fields manually...')
-            result = _extract_fields_from_truncated_json(json_str)
+            result = _extract_fields_from_truncated_json(text[first_brace:])
             if result:
                 logger.info('Successfully extracted fields from truncated JSON')
-                return result
+                return result, False
         
         # If all parsing attempts failed, log the full response and raise error
         logger.error(f'Failed to parse JSON. Full response: {response_text[:1000]}')
@@ -336,11 +810,31 @@ def parse_gemini_response(response_text: str) -> Dict[str, Any]:
             f'Please check the server logs for the full response.'
         )
         
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         logger.error(f'JSON decode error: {str(e)}. Response: {response_text[:500]}')
         raise GeminiAnalysisError(f'Invalid JSON in Gemini response: {str(e)}')
 
 
+def _unescape_json_string(value: str) -> str:
+    """
+    Decode the escape sequences in the body of a JSON string literal.
+    
+    Uses the stdlib JSON string scanner, so every escape is handled in a
+    single pass; non-ASCII text is left untouched.
+    
+    Args:
+        value: String literal contents without the surrounding quotes
+        
+    Returns:
+        Unescaped string, or the input with quotes and newlines unescaped
+        if it contains an invalid escape
+    """
+    try:
+        return json.decoder.scanstring(value + '"', 0, False)[0]
+    except ValueError:
+        return value.replace('\\"', '"').replace('\\n', '\n')
+
+
 def _extract_fields_from_truncated_json(json_str: str) -> Optional[Dict[str, Any]]:
     """
     Extract fields from truncated/incomplete JSON using regex.
@@ -353,29 +847,20 @@ def _extract_fields_from_truncated_json(json_str: str) -> Optional[Dict[str, Any
     """
     result = {}
     
-    # Extract summary - handle multi-line and escaped content
-    summary_match = re.search(r'"summary"\s*:\s*"((?:[^"\\]|\\.)*)"', json_str)
-    if summary_match:
-        result['summary'] = summary_match.group(1).replace('\\"', '"').replace('\\n', '\n')
-    
-    # Extract mermaid_code - handle newlines and escapes
-    mermaid_match = re.search(r'"mermaid_code"\s*:\s*"((?:[^"\\]|\\.)*)"', json_str)
-    if mermaid_match:
-        result['mermaid_code'] = mermaid_match.group(1).replace('\\"', '"').replace('\\n', '\n')
-    
-    # Extract detected_issues array - handle complete and partial arrays
-    issues_match = re.search(r'"detected_issues"\s*:\s*\[(.*?)(?:\]|$)', json_str, re.DOTALL)
-    if issues_match:
-        issues_str = issues_match.group(1)
-        issues = re.findall(r'"((?:[^"\\]|\\.)*)"', issues_str)
-        result['detected_issues'] = [i.replace('\\"', '"') for i in issues]
-    
-    # Extract fix_recommendations array - handle complete and partial arrays
-    fixes_match = re.search(r'"fix_recommendations"\s*:\s*\[(.*?)(?:\]|$)', json_str, re.DOTALL)
-    if fixes_match:
-        fixes_str = fixes_match.group(1)
-        fixes = re.findall(r'"((?:[^"\\]|\\.)*)"', fixes_str)
-        result['fix_recommendations'] = [f.replace('\\"', '"') for f in fixes]
+    # Scan once for every known field; string fields may contain escapes and
+    # array fields may be cut off before their closing bracket
+    for match in _FIELD_RE.finditer(json_str):
+        key = match['key']
+        string_value = match['string']
+        array_value = match['array']
+        if key in result:
+            continue
+        if key in ('summary', 'mermaid_code'):
+            if string_value is not None:
+                result[key] = _unescape_json_string(string_value)
+        elif array_value is not None:
+            items = _QUOTED_RE.findall(array_value)
+            result[key] = [_unescape_json_string(item) for item in items]
     
     # Return result if we got at least summary (the most important field)
     if 'summary' in result:
@@ -406,17 +891,96 @@ def validate_response_schema(data: Dict[str, Any]) -> Dict[str, Any]:
     validated = {
         'summary': str(data.get('summary', 'No summary generated')),
         'mermaid_code': str(data.get('mermaid_code', 'sequenceDiagram\n    participant A\n    participant B\n    A->>B: Analysis incomplete')),
-        'detected_issues': data.get('detected_issues', []) if isinstance(data.get('detected_issues'), list) else [],
-        'fix_recommendations': data.get('fix_recommendations', []) if isinstance(data.get('fix_recommendations'), list) else [],
     }
     
-    # Ensure issues and recommendations are lists of strings
-    validated['detected_issues'] = [str(issue) for issue in validated['detected_issues']]
-    validated['fix_recommendations'] = [str(rec) for rec in validated['fix_recommendations']]
+    # Ensure issues and recommendations are lists of strings (Gemini normally returns strings)
+    for field in ('detected_issues', 'fix_recommendations'):
+        items = data.get(field)
+        if not isinstance(items, list):
+            items = []
+        validated[field] = [item if type(item) is str else str(item) for item in items]
     
     return validated
 
 
+def _take_lines(segment: str, budget: int) -> str:
+    """
+    Return the lines of a segment that start within a character budget.
+    
+    Each line costs its length plus one for the newline, so a line is kept
+    when fewer than budget characters were spent before it.
+    
+    Args:
+        segment: One or more newline-separated lines
+        budget: Characters left (at least 1)
+        
+    Returns:
+        Leading whole lines of the segment
+    """
+    cut = segment.find('\n', budget - 1)
+    return segment if cut == -1 else segment[:cut]
+
+
+def _trim_readme(readme_content: str, max_length: int) -> str:
+    """
+    Trim a README to essential content within a character budget.
+    
+    Prioritizes title, description, features, installation and usage: the
+    first 400 characters are always kept, sections under skip headers
+    (FAQ, roadmap, ...) are dropped, and other sections are kept only while
+    they follow a priority header. Works on whole header-delimited segments
+    rather than line by line.
+    
+    Args:
+        readme_content: Cleaned README content
+        max_length: Maximum number of characters to keep
+        
+    Returns:
+        Trimmed README
+    """
+    essential_parts = []
+    char_count = 0
+    in_priority_section = True  # Start assuming we're in important content
+    
+    def add_body(body: str) -> None:
+        nonlocal char_count
+        limit = max_length if in_priority_section else min(400, max_length)  # Always take first 400 chars
+        if char_count < limit:
+            body = _take_lines(body, limit - char_count)
+            essential_parts.append(body)
+            char_count += len(body) + 1
+    
+    pos = 0
+    for match in _HEADER_LINE_RE.finditer(readme_content):
+        # Body lines between the previous header (or the start) and this one
+        if match.start() > pos:
+            add_body(readme_content[pos:match.start() - 1])
+        pos = match.end() + 1
+        if char_count >= max_length:
+            break
+        
+        # Check if entering a priority or skip section
+        header_text = match.group(1).strip().lower()
+        if any(p in header_text for p in _SKIP_HEADERS):
+            in_priority_section = False
+            continue
+        elif any(p in header_text for p in _PRIORITY_HEADERS):
+            in_priority_section = True
+        # Always include headers (they're short)
+        essential_parts.append(match.group(0))
+        char_count += len(match.group(0)) + 1
+    else:
+        # Body lines after the last header
+        if pos <= len(readme_content) and char_count < max_length:
+            add_body(readme_content[pos:])
+    
+    readme_content = '\n'.join(essential_parts)
+    # Final trim if still over
+    if len(readme_content) > max_length:
+        readme_content = readme_content[:max_length].rsplit(' ', 1)[0] + '...'
+    return readme_content
+
+
 def perform_deep_analysis(repo_url: str) -> Dict[str, Any]:
     """
     Perform comprehensive architectural analysis of a GitHub repository using Gemini.
@@ -424,9 +988,10 @@ def perform_deep_analysis(repo_url: str) -> Dict[str, Any]:
     Process:
     1. Fetch README.md from the repository
     2. Configure Gemini 1.5 Pro model
-    3. Send detailed analysis prompt to Gemini
-    4. Parse and validate the JSON response
-    5. Return structured analysis results
+    3. Reuse a cached analysis if the same prompt went to the same model before
+    4. Send detailed analysis prompt to Gemini
+    5. Parse and validate the JSON response, caching it if complete
+    6. Return structured analysis results
     
     Args:
         repo_url: GitHub repository URL
@@ -450,132 +1015,95 @@ def perform_deep_analysis(repo_url: str) -> Dict[str, Any]:
         
         # Step 2: Clean README - strip images, badges, license, etc.
         logger.debug('Cleaning README content...')
-        readme_content = clean_readme_content(readme_content)
-        logger.info(f'README after cleaning: {len(readme_content)} characters')
+        readme_content = clean_readme_content(readme_content, _README_SCAN_LENGTH)
+        readme_length = len(readme_content)
+        logger.info(f'README after cleaning: {readme_length} characters')
         
         # Step 3: Trim to essential content (even for short READMEs)
-        max_readme_length = 1200  # Slightly higher limit since we cleaned it
-        
-        if len(readme_content) > max_readme_length:
-            # Prioritize: title, description, features, installation, usage
-            lines = readme_content.split('\n')
-            essential_lines = []
-            char_count = 0
-            in_priority_section = True  # Start assuming we're in important content
-            
-            priority_headers = ['install', 'usage', 'feature', 'getting started', 'quick start', 'overview', 'about']
-            skip_headers = ['faq', 'troubleshoot', 'test', 'development', 'roadmap']
-            
-            for line in lines:
-                if char_count >= max_readme_length:
-                    break
-                
-                line_lower = line.lower().strip()
-                
-                # Check if entering a priority or skip section
-                if line_lower.startswith('#'):
-                    header_text = line_lower.lstrip('#').strip()
-                    if any(p in header_text for p in skip_headers):
-                        in_priority_section = False
-                        continue
-                    elif any(p in header_text for p in priority_headers):
-                        in_priority_section = True
-                    # Always include headers (they're short)
-                    essential_lines.append(line)
-                    char_count += len(line) + 1
-                elif in_priority_section or char_count < 400:  # Always take first 400 chars
-                    essential_lines.append(line)
-                    char_count += len(line) + 1
-            
-            readme_content = '\n'.join(essential_lines)
-            # Final trim if still over
-            if len(readme_content) > max_readme_length:
-                readme_content = readme_content[:max_readme_length].rsplit(' ', 1)[0] + '...'
+        if readme_length > _MAX_README_LENGTH:
+            readme_content = _trim_readme(readme_content, _MAX_README_LENGTH)
+            readme_length = len(readme_content)
         
-        logger.info(f'Final README size for API: {len(readme_content)} characters')
+        logger.info(f'Final README size for API: {readme_length} characters')
         
         # Step 4: Configure Gemini Flash (required for free tier - 10x higher rate limits)
         logger.debug('Configuring Gemini Flash model...')
         model = configure_gemini_model()
         
         # Step 5: Ultra-minimal prompt with explicit JSON format requirement
-        analysis_prompt = f"""Analyze this README and return ONLY valid JSON (no markdown, no code blocks, no text):
-
-README: {readme_content}
-
-Required JSON format (copy this structure exactly):
-{{
-    "summary": "Brief 2 sentence architecture summary",
-    "mermaid_code": "sequenceDiagram\\n    participant User\\n    participant App\\n    User->>App: request",
-    "detected_issues": ["Issue 1", "Issue 2"],
-    "fix_recommendations": ["Fix 1", "Fix 2"]
-}}
-
-CRITICAL: Return ONLY the JSON object. No markdown, no code blocks, no explanations, no text before or after."""
+        analysis_prompt = _PROMPT_TEMPLATE % {'readme': readme_content}
+        
+        # The same prompt (README and template) sent to the same model gets the same
+        # analysis, so reuse a cached result
+        model_name = getattr(model, 'model_name', '')
+        prompt_digest = hashlib.blake2b(
+            f'{model_name}\n{analysis_prompt}'.encode('utf-8'), digest_size=16
+        ).hexdigest()
+        cache_key = f'analysis:{prompt_digest}'
+        cached_response = cache.get(cache_key)
+        if cached_response is not None:
+            logger.info(f'Using cached analysis for {repo_url}')
+            return cached_response
+        
+        # Use response_mime_type to force JSON output if supported
+        json_mode = _supports_json_mode()
+        if json_mode:
+            generation_config = _JSON_GENERATION_CONFIG
+        else:
+            logger.debug('JSON mode not supported by installed SDK, using regular config')
+            generation_config = _GENERATION_CONFIG
         
         logger.debug('Sending request to Gemini...')
         
         # Retry logic with exponential backoff for 429 errors
-        max_retries = 3
-        base_delay = 30  # Start with 30 second delay
+        max_retries = settings.GEMINI_MAX_RETRIES
+        base_delay = settings.GEMINI_RETRY_BASE_DELAY
+        max_attempts = max_retries + 1
         
-        for attempt in range(max_retries):
+        for attempt in range(max_attempts):
             try:
-                # Use response_mime_type to force JSON output if supported
-                try:
-                    response = model.generate_content(
-                        analysis_prompt,
-                        generation_config={
-                            'temperature': 0.2,  # Very low for consistent JSON
-                            'max_output_tokens': 1500,  # Enough for complete JSON response
-                            'top_p': 0.7,
-                            'top_k': 15,
-                            'response_mime_type': 'application/json',  # Force JSON output
-                        }
-                    )
-                except (Exception, TypeError) as config_error:
-                    # If response_mime_type not supported, use regular config
-                    logger.debug(f'JSON mode not supported, using regular config: {str(config_error)}')
-                    response = model.generate_content(
-                        analysis_prompt,
-                        generation_config={
-                            'temperature': 0.2,
-                            'max_output_tokens': 1500,  # Enough for complete JSON response
-                            'top_p': 0.7,
-                            'top_k': 15
-                        }
-                    )
+                response = model.generate_content(
+                    analysis_prompt,
+                    generation_config=generation_config,
+                )
                 break  # Success, exit retry loop
                 
             except Exception as e:
-                error_str = str(e).lower()
-                is_rate_limit = any(x in error_str for x in ['429', 'quota', 'rate limit', 'resource exhausted'])
-                
-                if is_rate_limit and attempt < max_retries - 1:
-                    delay = base_delay * (2 ** attempt)  # Exponential backoff: 30s, 60s, 120s
-                    logger.warning(f'Rate limit hit (attempt {attempt + 1}/{max_retries}). Sleeping {delay}s...')
-                    time.sleep(delay)
-                elif is_rate_limit:
+                if not _is_rate_limit_error(e):
+                    # Not a rate limit error, raise immediately; an auth or model failure
+                    # means the cached model is unusable, so resolve it again next time
+                    if _is_auth_error(e) or _is_model_error(e):
+                        _invalidate_cached_model()
+                    raise
+                if attempt >= max_retries:
                     raise GeminiAnalysisError(
-                        f'API quota exceeded after {max_retries} attempts. '
+                        f'API quota exceeded after {max_attempts} attempts. '
                         f'Please wait a few minutes before trying again.'
                     )
-                else:
-                    # Not a rate limit error, raise immediately
-                    raise
+                
+                delay = base_delay * (2 ** attempt)  # Exponential backoff: 30s, 60s, ...
+                logger.warning(f'Rate limit hit (attempt {attempt + 1}/{max_attempts}). Sleeping {delay}s...')
+                time.sleep(delay)
         
-        if not response.text:
+        # response.text joins the candidate parts on every access, so read it once
+        response_text = response.text
+        if not response_text:
             raise GeminiAnalysisError('Empty response from Gemini model')
         
-        logger.info(f'Received response from Gemini (length: {len(response.text)} chars)')
-        logger.debug(f'Gemini response preview: {response.text[:300]}...')
+        logger.info(f'Received response from Gemini (length: {len(response_text)} chars)')
+        logger.debug(f'Gemini response preview: {response_text[:300]}...')
         
         logger.debug('Parsing Gemini response...')
-        parsed_response = parse_gemini_response(response.text)
+        parsed_response, complete = _parse_gemini_response(response_text, json_mode)
         
         logger.debug('Validating response schema...')
         validated_response = validate_response_schema(parsed_response)
         
+        # Only cache complete analyses; a truncated or partial one may succeed on retry
+        complete = complete and all(field in parsed_response for field in validated_response)
+        if complete and settings.ANALYSIS_CACHE_TIMEOUT > 0:
+            cache.set(cache_key, validated_response, timeout=settings.ANALYSIS_CACHE_TIMEOUT)
+        
         logger.info(f'Analysis completed successfully for {repo_url}')
         return validated_response
         
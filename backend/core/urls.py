@@ -3,11 +3,12 @@ URL configuration for core app
 """
 
 from django.urls import path
-from core.views import AnalyzeRepoView, HealthCheckView
+from core.views import AnalyzeRepoView, AnalyzeRepoStatusView, HealthCheckView
 
 app_name = 'core'
 
 urlpatterns = [
     path('analyze/', AnalyzeRepoView.as_view(), name='analyze-repo'),
+    path('analyze/<str:job_id>/', AnalyzeRepoStatusView.as_view(), name='analyze-status'),
     path('health/', HealthCheckView.as_view(), name='health-check'),
 ]
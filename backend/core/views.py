@@ -7,10 +7,14 @@ import logging
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
 from core.gemini_service import perform_deep_analysis, GeminiAnalysisError
+from core.analysis_jobs import (
+    submit_analysis, get_analysis_job, AnalysisQueueFullError, PENDING, COMPLETED, FAILED
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +35,9 @@ class AnalyzeRepoView(APIView):
             "fix_recommendations": [...]
         }
     }
+    
+    With ANALYSIS_ASYNC enabled the analysis runs in the background and the
+    response is 202: {"success": true, "job_id": "...", "status": "pending"}
     """
     
     def post(self, request):
@@ -71,6 +78,27 @@ class AnalyzeRepoView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
+            if settings.ANALYSIS_ASYNC:
+                try:
+                    job_id = submit_analysis(github_url)
+                except AnalysisQueueFullError as e:
+                    logger.warning(f'Analysis queue full, rejecting: {github_url}')
+                    return Response(
+                        {
+                            'success': False,
+                            'error': str(e)
+                        },
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE
+                    )
+                return Response(
+                    {
+                        'success': True,
+                        'job_id': job_id,
+                        'status': PENDING
+                    },
+                    status=status.HTTP_202_ACCEPTED
+                )
+            
             logger.info(f'Starting analysis for: {github_url}')
             
             # Perform the analysis
@@ -109,6 +137,52 @@ class AnalyzeRepoView(APIView):
             )
 
 
+class AnalyzeRepoStatusView(APIView):
+    """
+    API endpoint for polling a background analysis job.
+    
+    GET /api/analyze/<job_id>/
+    - Response: {
+        "success": true,
+        "job_id": "...",
+        "status": "pending" | "running" | "completed" | "failed",
+        "data": {...}  # once completed
+    }
+    """
+    
+    def get(self, request, job_id):
+        """
+        Handle GET request for an analysis job's status.
+        
+        Args:
+            request: Django HTTP request
+            job_id: Job id returned by POST /api/analyze/
+            
+        Returns:
+            Response with job status, plus results or error once finished
+        """
+        job = get_analysis_job(job_id)
+        if job is None:
+            return Response(
+                {
+                    'success': False,
+                    'error': 'Analysis job not found or expired'
+                },
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        body = {
+            'success': job['status'] != FAILED,
+            'job_id': job_id,
+            'status': job['status']
+        }
+        if job['status'] == COMPLETED:
+            body['data'] = job['data']
+        elif job['status'] == FAILED:
+            body['error'] = job['error']
+        return Response(body, status=status.HTTP_200_OK)
+
+
 class RootView(APIView):
     """Welcome endpoint with API documentation"""
     
@@ -121,6 +195,7 @@ class RootView(APIView):
                 'endpoints': {
                     'health': '/api/health/',
                     'analyze': '/api/analyze/ (POST)',
+                    'analyze_status': '/api/analyze/<job_id>/ (GET, when ANALYSIS_ASYNC is enabled)',
                 },
                 'documentation': {
                     'analyze_description': 'Deep repository architectural analysis using Gemini 1.5 Pro',